@@ -8,11 +8,40 @@ from datetime import datetime, timedelta # start yr for scrape process
 import pandas as pd
 import PyPDF2
 import io  # handling PDF byte stream
+import os
+import json
+import gzip
+import hashlib
+import tempfile
+import sys
+import threading
+import cProfile
+import pstats
+import tracemalloc
+import contextlib
+import inspect
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+try:
+    import brotli  # optional, .br output copies skipped if not installed
+except ImportError:
+    brotli = None
 
 # limiters just to avoid full scrape hits during testing/debug
 DEBUG_MODE = False  # False for full scrape
 DEBUG_YEAR_LIMIT = 2025  # scrape single yr
 
+# per-stage profiling, run with: python hmi_youth_justice_inspection_scrape.py --profile[=time|memory]
+# time and memory are separate runs, as tracemalloc inflates (allocation-heavy) stage timings
+PROFILE_MODE = next(
+    (arg.partition("=")[2] or "time" for arg in sys.argv[1:] if arg.partition("=")[0] == "--profile"), None
+)
+if PROFILE_MODE not in (None, "time", "memory"):
+    sys.exit(f"Unknown profile mode '{PROFILE_MODE}', use --profile=time or --profile=memory")
+PROFILE_DIR = "profile_output"  # pstats, tracemalloc and collapsed stack files written here
+PROFILE_TOP_N = 25  # allocation sites listed per stage
+PROFILE_SAMPLE_INTERVAL = 0.005  # secs between call stack samples (collapsed stack file)
 
 
 
@@ -36,6 +65,139 @@ def get_soup(url, max_attempts=2, delay=2):
             else:
                 return None
 
+
+# profiling state, stages accumulate across repeat calls (e.g. once per LA report)
+stage_profilers = {}                        # stage label -> cProfile.Profile
+stage_allocations = defaultdict(Counter)    # stage label -> {alloc site: net bytes}
+stage_peak_memory = defaultdict(int)        # stage label -> peak bytes above stage entry level
+stage_stack_samples = Counter()             # "stage;frame;frame..." -> sample count
+active_stage = None
+stack_sampler = None
+stack_sampler_stop = threading.Event()
+profiler_lines = set()                      # (filename, lineno) of this file's profiling helpers
+profiler_files = {tracemalloc.__file__, threading.__file__, contextlib.__file__}
+
+
+def sample_stacks(main_thread_id):
+    """Sample main thread call stack while a stage is active (collapsed stack format)."""
+    while not stack_sampler_stop.wait(PROFILE_SAMPLE_INTERVAL):
+        stage = active_stage
+        frame = sys._current_frames().get(main_thread_id)
+        if stage is None or frame is None:
+            continue
+
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stage_stack_samples[";".join([stage] + stack[::-1])] += 1
+
+
+def profiler_source_lines():
+    """(filename, lineno) pairs of this file's profiling helpers, skipped in allocation reports."""
+    lines = set()
+    for helper in (sample_stacks, profile_stage.__wrapped__, write_profile_reports):
+        source_lines, first_line = inspect.getsourcelines(helper)
+        filename = helper.__code__.co_filename
+        lines.update((filename, lineno) for lineno in range(first_line, first_line + len(source_lines)))
+    return lines
+
+
+def start_profiling():
+    """Start time (stack sampler) or memory (tracemalloc) profiling, only used with --profile."""
+    global stack_sampler
+    print(f"Profile Mode ({PROFILE_MODE}): stage reports will be written to `{PROFILE_DIR}/`")
+    if PROFILE_MODE == "memory":
+        profiler_lines.update(profiler_source_lines())
+        tracemalloc.start()
+    else:
+        stack_sampler = threading.Thread(target=sample_stacks, args=(threading.get_ident(),), daemon=True)
+        stack_sampler.start()
+
+
+@contextmanager
+def profile_stage(label):
+    """
+    Profile the enclosed block under a stage label, cProfile (time) or tracemalloc (memory).
+    No-op unless PROFILE_MODE.
+
+    Args:
+        label (str): Pipeline stage name, used in output file names.
+    """
+    global active_stage
+    if not PROFILE_MODE:
+        yield
+        return
+
+    if PROFILE_MODE == "time":
+        if label not in stage_profilers:
+            stage_profilers[label] = cProfile.Profile()
+        profiler = stage_profilers[label]
+        active_stage = label
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            active_stage = None
+        return
+
+    snapshot_before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    baseline_memory = tracemalloc.get_traced_memory()[0]  # already held on entry, not charged to stage
+    try:
+        yield
+    finally:
+        stage_peak = tracemalloc.get_traced_memory()[1] - baseline_memory
+        stage_peak_memory[label] = max(stage_peak_memory[label], stage_peak)
+
+        # net allocation growth by source line, skipping profiler's own
+        # (checked after compare, much cheaper than snapshot filter_traces)
+        snapshot_after = tracemalloc.take_snapshot()
+        for stat in snapshot_after.compare_to(snapshot_before, "lineno"):
+            frame = stat.traceback[0]
+            if frame.filename in profiler_files or (frame.filename, frame.lineno) in profiler_lines:
+                continue
+            if stat.size_diff > 0:
+                stage_allocations[label][f"{frame.filename}:{frame.lineno}"] += stat.size_diff
+
+
+def write_profile_reports():
+    """Stop profiling and write per-stage pstats + collapsed stacks (time) or tracemalloc top-N (memory)."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+
+    if PROFILE_MODE == "memory":
+        tracemalloc.stop()
+        print("\nProfile summary (peak memory allocated within stage):")
+        for label, peak in stage_peak_memory.items():
+            with open(os.path.join(PROFILE_DIR, f"{label}_tracemalloc.txt"), "w", encoding="utf-8") as f:
+                f.write(f"Stage: {label}\n")
+                f.write(f"Peak memory allocated within stage: {peak / 1024:.1f} KiB\n")
+                f.write(f"Top {PROFILE_TOP_N} allocation sites (net bytes retained by stage):\n")
+                for site, size in stage_allocations[label].most_common(PROFILE_TOP_N):
+                    f.write(f"{size / 1024:12.1f} KiB  {site}\n")
+            print(f"  {label:<20} {peak / 1024:10.1f} KiB")
+        print("Note: tracemalloc slows allocation-heavy code, use --profile (time mode) for timings")
+
+    else:
+        stack_sampler_stop.set()
+        if stack_sampler is not None:
+            stack_sampler.join()
+
+        print("\nProfile summary (cumulative secs per stage):")
+        for label, profiler in stage_profilers.items():
+            profiler.dump_stats(os.path.join(PROFILE_DIR, f"{label}.pstats"))
+            print(f"  {label:<20} {pstats.Stats(profiler).total_tt:8.2f}s")
+        print("Note: cProfile adds per-call overhead, call-heavy stages (e.g. parsing) read slower than real")
+
+        # collapsed stacks, readable by flamegraph.pl / speedscope / inferno
+        with open(os.path.join(PROFILE_DIR, "stages.collapsed"), "w", encoding="utf-8") as f:
+            for stack, count in sorted(stage_stack_samples.items()):
+                f.write(f"{stack} {count}\n")
+
+    print(f"✅ Profile reports saved to `{PROFILE_DIR}/`")
+
             
 def clean_la_name(raw_name):
     """Clean and standardise the local authority name."""
@@ -201,8 +363,12 @@ def scrape_inspection_links(start_year=None, end_year=2018):
 #     return inspection_links
 
 
+if PROFILE_MODE:
+    start_profiling()
+
 # scraper and collect report links
-inspection_data = scrape_inspection_links()
+with profile_stage("discovery"):
+    inspection_data = scrape_inspection_links()
 
 # debug / ref
 print("\nFinal Inspection Links Collected:")
@@ -280,32 +446,141 @@ def extract_ratings_from_pdf(pdf_url):
 #     }
 
 
-def correct_column_names(extracted_columns):
+# Grading domain registry
+# HMIP YJ inspection frameworks, domain code (as captured from ratings page, e.g. "2.3") -> fixed ratings column.
+# Framework detected per report (see detect_framework), as 3.4 differs between them.
+# Court (2.x) and out-of-court (3.x) domains with the same title get their own columns.
+INSPECTION_FRAMEWORKS = {
+    "yjs_2018": {
+        "1.1": "governance_and_leadership",
+        "1.2": "staff",
+        "1.3": "partnerships_and_services",
+        "1.4": "information_and_facilities",
+        "2.1": "court_assessment",
+        "2.2": "court_planning",
+        "2.3": "court_implementation_and_delivery",
+        "2.4": "reviewing",
+        "3.1": "out_of_court_assessment",
+        "3.2": "out_of_court_planning",
+        "3.3": "out_of_court_implementation_and_delivery",
+        "3.4": "out_of_court_disposal_policy_and_provision",
+        "4.1": "resettlement_policy_and_provision",
+    },
+    "yjs_revised": {
+        "1.1": "governance_and_leadership",
+        "1.2": "staff",
+        "1.3": "partnerships_and_services",
+        "1.4": "information_and_facilities",
+        "2.1": "court_assessment",
+        "2.2": "court_planning",
+        "2.3": "court_implementation_and_delivery",
+        "2.4": "reviewing",
+        "3.1": "out_of_court_assessment",
+        "3.2": "out_of_court_planning",
+        "3.3": "out_of_court_implementation_and_delivery",
+        "3.4": "joint_working",
+        "3.5": "policy_and_provision",
+        "4.1": "resettlement_policy_and_provision",
+    },
+}
+
+RECORD_COLUMNS = ["la_name", "la_ref", "score_%", "overall_rating", "publication_date", "report_url"]
+DOMAIN_COLUMNS = list(dict.fromkeys(
+    column for framework in INSPECTION_FRAMEWORKS.values() for column in framework.values()
+))
+RATINGS_COLUMNS = RECORD_COLUMNS + DOMAIN_COLUMNS
+COLUMN_SLOTS = {column: slot for slot, column in enumerate(RATINGS_COLUMNS)}
+
+GRADE_DTYPE = pd.CategoricalDtype(["Outstanding", "Good", "Requires Improvement", "Inadequate"])
+GRADE_NAMES = {grade.lower(): grade for grade in GRADE_DTYPE.categories}  # parsed (lowercase) -> category
+RATINGS_DTYPES = {column: GRADE_DTYPE for column in DOMAIN_COLUMNS}
+
+
+def domain_key(domain_name):
+    """Letters-only lowercase key, tolerant of PDF spacing/hyphen artefacts (e.g. 'Partners hips', 'Outofcourt')."""
+    return re.sub(r"[^a-z]", "", domain_name.lower())
+
+
+# domain title as printed on ratings page, where it differs from the column name
+DOMAIN_TITLES = {
+    "court_assessment": "Assessment",
+    "court_planning": "Planning",
+    "court_implementation_and_delivery": "Implementation and delivery",
+    "out_of_court_assessment": "Assessment",
+    "out_of_court_planning": "Planning",
+    "out_of_court_implementation_and_delivery": "Implementation and delivery",
+}
+DOMAIN_TITLE_KEYS = {column: domain_key(DOMAIN_TITLES.get(column, column)) for column in DOMAIN_COLUMNS}
+
+# domain title key -> column(s), to detect framework and cross-check code mapping
+DOMAIN_NAME_COLUMNS = defaultdict(list)
+for column, title_key in DOMAIN_TITLE_KEYS.items():
+    DOMAIN_NAME_COLUMNS[title_key].append(column)
+
+
+def detect_framework(domains):
     """
-    Correct known mis-extracted column names dynamically.
+    Pick the registry framework whose code -> column map agrees with most parsed domains.
 
     Args:
-        extracted_columns (list): List of column names extracted from a report.
+        domains (list): Parsed (domain_code, domain_name, grade) tuples from one report.
 
     Returns:
-        dict: A dictionary mapping incorrect column names to corrected ones (only for present columns).
+        str: INSPECTION_FRAMEWORKS key (first registered framework on a tie).
     """
-    fix_column_mappings = {
-        "Partners hips and services": "Partnerships and services",
-        "Outofcourt disposal policy and provision": "Out-of-court disposal policy and provision"
-    }
-    
-    return {col: fix_column_mappings[col] for col in extracted_columns if col in fix_column_mappings}
+    def agreement(framework_name):
+        framework = INSPECTION_FRAMEWORKS[framework_name]
+        return sum(
+            1 for code, name, _ in domains
+            if code in framework and DOMAIN_TITLE_KEYS[framework[code]] == domain_key(name)
+        )
+
+    return max(INSPECTION_FRAMEWORKS, key=agreement)
+
+
+def domain_column(framework, domain_code, domain_name):
+    """
+    Find fixed ratings column for a parsed grading domain.
+
+    Args:
+        framework (dict): Detected framework, code -> column (from INSPECTION_FRAMEWORKS).
+        domain_code (str): Domain number as on the ratings page, e.g. "2.3".
+        domain_name (str): Domain name as extracted from the PDF.
+
+    Returns:
+        str | None: Column in RATINGS_COLUMNS, None if domain not in registry.
+    """
+    code_column = framework.get(domain_code)
+    name_columns = DOMAIN_NAME_COLUMNS.get(domain_key(domain_name), [])
+    name_column = name_columns[0] if len(name_columns) == 1 else None  # e.g. 'Assessment' needs the code
+
+    # a recognised name that disagrees with the code is more likely a registry gap than a mislabelled grade
+    if name_columns and code_column and code_column not in name_columns:
+        print(f"⚠️ Domain {domain_code} '{domain_name}' not {code_column} as registered")
+        return name_column
+    return code_column or name_column
+
+
+def ratings_dataframe(ratings_data):
+    """Build typed ratings DataFrame from fixed-slot records (see RATINGS_COLUMNS)."""
+    ratings_df = pd.DataFrame.from_records(ratings_data, columns=RATINGS_COLUMNS)
+
+    # astype would silently turn non-category grades into NaN, report them first
+    for column in DOMAIN_COLUMNS:
+        unexpected = ratings_df[column].notna() & ~ratings_df[column].isin(GRADE_DTYPE.categories)
+        if unexpected.any():
+            print(f"⚠️ Unexpected {column} grade(s) dropped: {sorted(set(ratings_df.loc[unexpected, column]))}")
+            ratings_df[column] = ratings_df[column].mask(unexpected)
+
+    return ratings_df.astype(RATINGS_DTYPES)
 
 
 def parse_ratings(report_url, ratings_text, la_ref, la_name, publication_date):
-    """Parse extracted text from PDFs to structure the ratings."""
+    """Parse extracted text from PDFs to a fixed-slot ratings record (see RATINGS_COLUMNS)."""
     lines = ratings_text.split("\n")
     overall_rating = None
     score = None
-    graded_outcomes = {}
-
-    grading_outcomes = {"inadequate", "requires improvement", "good", "outstanding"}
+    record = [None] * len(RATINGS_COLUMNS)  # fixed slots, see RATINGS_COLUMNS
 
     for i, line in enumerate(lines):
         line = re.sub(r"\s+", " ", line).strip()
@@ -338,34 +613,41 @@ def parse_ratings(report_url, ratings_text, la_ref, la_name, publication_date):
     # Cleaned graded outcomes extraction
     cleaned_lines = [re.sub(r"\s+", " ", line).strip() for line in lines if line.strip()]
 
+    domains = []
     for line in cleaned_lines:
-        match = re.match(r"^[PR]?\s*(\d+\.\d+)\s(.+?)\s(\w+)$", line)
+        # grade is last word, or two for 'Requires improvement'
+        match = re.match(r"^[PR]?\s*(\d+\.\d+)\s(.+?)\s((?i:requires\s+improvement)|\w+)$", line)
         if match:
+            domain_code = match.group(1)
             category_name = match.group(2).strip()
-            grade = match.group(3).capitalize()
+            grade = GRADE_NAMES.get(re.sub(r"\s+", " ", match.group(3)).lower())  # category spelling
 
-            if grade.lower() in grading_outcomes:
-                graded_outcomes[category_name] = grade
+            if grade:
+                domains.append((domain_code, category_name, grade))
 
-    # correction(s) for known mis-extracted/typo column names
-    fix_column_mappings = {
-        "Partners hips and services": "Partnerships and services",
-        "Outofcourt disposal policy and provision": "Out-of-court disposal policy and provision"
-    }
-    corrected_outcomes = {fix_column_mappings.get(k, k): v for k, v in graded_outcomes.items()}
+    framework = INSPECTION_FRAMEWORKS[detect_framework(domains)]
+    for domain_code, category_name, grade in domains:
+        column = domain_column(framework, domain_code, category_name)
+        if column is None:
+            print(f"⚠️ Unknown grading domain for {la_name}: {domain_code} {category_name}")
+            continue
+
+        slot = COLUMN_SLOTS[column]
+        if record[slot] is not None and record[slot] != grade:
+            print(f"⚠️ {la_name}: {column} already graded {record[slot]}, replaced by {domain_code} grade {grade}")
+        record[slot] = grade
 
     # # Debug - corrected grading outcome
     # print(f"Debug: {la_name} - Fixed Overall Rating: {overall_rating}")
 
-    record = {
-        "la_name": la_name,  
-        "la_ref": la_ref,
-        "score_%": score if score else "N/A",
-        "overall_rating": overall_rating,
-        "publication_date": publication_date,
-        "report_url": report_url,
-        **corrected_outcomes  # outcome col headers
-    }
+    record[:len(RECORD_COLUMNS)] = [
+        la_name,
+        la_ref,
+        score if score else "N/A",
+        overall_rating,
+        publication_date,
+        report_url,
+    ]
     # record = {
     #     "LA_name": la_name,  
     #     "LA_ref": la_ref,
@@ -391,26 +673,31 @@ def scrape_inspections():
 
         print(f"\nProcessing: {la_name} ({details['year']}) \n-> {report_url}")
 
-        soup = get_soup(report_url)
-        if not soup:
-            continue
+        with profile_stage("report_fetch"):
+            soup = get_soup(report_url)
 
-        # Find first valid PDF link (inspection reports always top/first)
-        pdf_url = None
+            # Find first valid PDF link (inspection reports always top/first)
+            pdf_url = None
 
-        for pdf_link in soup.find_all("a", href=True):
-            if "inspection" in " ".join(pdf_link.text.lower().split()) and pdf_link["href"].endswith(".pdf"):
-                pdf_url = pdf_link["href"]
-                break  
+            if soup:
+                for pdf_link in soup.find_all("a", href=True):
+                    if "inspection" in " ".join(pdf_link.text.lower().split()) and pdf_link["href"].endswith(".pdf"):
+                        pdf_url = pdf_link["href"]
+                        break  
+
+        if not soup:
+            continue
 
         if not pdf_url:
             print(f"⚠️ No PDF found for: {la_name}")
             continue
 
         # Grab & parse ratings
-        ratings_text = extract_ratings_from_pdf(pdf_url)
+        with profile_stage("pdf_extraction"):
+            ratings_text = extract_ratings_from_pdf(pdf_url)
         if ratings_text != "Ratings page not found":
-            parsed_data = parse_ratings(report_url, ratings_text, la_ref, la_name, publication_date)  
+            with profile_stage("parsing"):
+                parsed_data = parse_ratings(report_url, ratings_text, la_ref, la_name, publication_date)  
             ratings_data.append(parsed_data)
             print(f"Data extracted for {la_name} - Published on {publication_date}")
 
@@ -420,15 +707,118 @@ def scrape_inspections():
 
 
 
+def write_atomic(path, content):
+    """
+    Write text to path via a temp file + rename, so readers never see a partial file.
+
+    Args:
+        path (str): Destination file path.
+        content (str | bytes): File content (str written as utf-8).
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    dir_name = os.path.dirname(os.path.abspath(path))
+
+    # mkstemp files are owner-only (0600), keep existing file mode or use the usual umask default
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)  # atomic on same filesystem
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def published_paths(path):
+    """Output path plus its precompressed copies (.br only if brotli available)."""
+    return [path, f"{path}.gz"] + ([f"{path}.br"] if brotli is not None else [])
+
+
+def publish_output(path, content):
+    """Atomically write precompressed .gz (and .br if brotli available) copies, then the output itself."""
+    data = content.encode("utf-8")
+    write_atomic(f"{path}.gz", gzip.compress(data, compresslevel=9, mtime=0))  # mtime=0, same input same bytes
+    if brotli is not None:
+        write_atomic(f"{path}.br", brotli.compress(data))
+    write_atomic(path, data)  # last, so an existing output means its copies are in place
+
+
+def content_hash(content):
+    """sha256 hex digest of text content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def published_hash(path):
+    """sha256 hex digest of the currently published file, None if not yet published."""
+    try:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return content_hash(f.read())
+    except FileNotFoundError:
+        return None
+
 
-def save_to_html(data_df, column_order, web_link_column="report_url"):
+def diff_la_records(previous_csv_path, csv_text, key="la_ref"):
     """
-    Exports data to an HTML table and saves as `index.html`.
+    Compare newly generated CSV data with the published CSV, by LA.
+
+    Args:
+        previous_csv_path (str): Path of currently published CSV.
+        csv_text (str): Newly generated CSV content.
+        key (str): Column identifying an LA record.
+
+    Returns:
+        dict: Lists of added, changed (with per-column old/new values) and removed LA records.
+    """
+    # read both sides as plain strings so comparison is like-for-like with the CSV output
+    current_df = pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+    if os.path.exists(previous_csv_path):
+        previous_df = pd.read_csv(previous_csv_path, dtype=str, keep_default_na=False)
+    else:
+        previous_df = pd.DataFrame(columns=current_df.columns)
+
+    previous = {row[key]: row for row in previous_df.to_dict("records")}
+    current = {row[key]: row for row in current_df.to_dict("records")}
+
+    changed = []
+    for la_ref in current.keys() & previous.keys():
+        columns = list(dict.fromkeys([*previous[la_ref], *current[la_ref]]))
+        changes = {
+            col: {"old": previous[la_ref].get(col, ""), "new": current[la_ref].get(col, "")}
+            for col in columns
+            if previous[la_ref].get(col, "") != current[la_ref].get(col, "")
+        }
+        if changes:
+            changed.append({key: la_ref, "la_name": current[la_ref].get("la_name", ""), "changes": changes})
+
+    return {
+        "added": [current[la_ref] for la_ref in sorted(current.keys() - previous.keys())],
+        "changed": sorted(changed, key=lambda r: r[key]),
+        "removed": [previous[la_ref] for la_ref in sorted(previous.keys() - current.keys())],
+    }
+
+
+def build_html(data_df, column_order, web_link_column="report_url"):
+    """
+    Builds the HTML summary page (published as `index.html`).
 
     Args:
         data_df (DataFrame): The processed inspection ratings data.
         column_order (list): Desired column order.
         web_link_column (str): Column containing hyperlinks to reports.
+
+    Returns:
+        str: HTML page content.
     """
     # main page title & intro text
     page_title = "HMI Probation Youth Justice Inspections Summary (Pre-Release)"
@@ -465,6 +855,9 @@ def save_to_html(data_df, column_order, web_link_column="report_url"):
     if 'la_ref' in data_df.columns:
         data_df.drop(columns=['la_ref'], inplace=True)
 
+    # grade cols are categorical, back to plain strings for web formatting below
+    data_df = data_df.astype({col: "object" for col in data_df.select_dtypes("category").columns})
+
     # Avoid NaN's being visible in the front-end/html table
     data_df = data_df.apply(lambda x: x.fillna("").infer_objects(copy=False) if x.dtype == "object" else x)
     # tidy up string case just for the web
@@ -643,60 +1036,54 @@ def save_to_html(data_df, column_order, web_link_column="report_url"):
     # Close HTML
     html_content += "\n</div>\n</body>\n</html>"
 
+    return html_content
 
-    with open("index.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
 
-    print("✅ Youth Justice Inspections summary saved as `index.html`")
 
+ratings_data = scrape_inspections()
 
+with profile_stage("dataframe_build"):
+    structured_data_df = ratings_dataframe(ratings_data)
 
-structured_data_df = pd.DataFrame(scrape_inspections())
+    # needs additional testing/verification
+    # making the asssumption here that if all the graded cols are unused, it's not an inspection report
+    structured_data_df.dropna(subset=DOMAIN_COLUMNS, how='all', inplace=True)
 
-# print(f"Pre-cleaned headers: {structured_data_df.columns}") # debug
+csv_path = "hmi_youth_justice_inspection_ratings.csv"
+changes_path = "hmi_youth_justice_inspection_changes.json"
 
-# clean headers
-structured_data_df.columns = (
-    structured_data_df.columns
-    .str.strip()  # leading/trailing spaces
-    .str.replace(r"\s+", " ", regex=True)  # multiple spaces to single space
-    .str.replace(r"[^\w\s%]", "", regex=True)  # rem special chars but keep %
-    .str.replace(" ", "_", regex=True)  # spaces to underscores
-    .str.replace("-", "_", regex=True)  # hyphens to underscores
-    .str.replace(" ", "", regex=True)  # quash remaining spaces
-    .str.lower()  # lowercase
-)
+csv_text = structured_data_df.to_csv(index=False)
 
+# create output single page, always built (and profiled), only published when changed
+with profile_stage("html_render"):
+    html_content = build_html(structured_data_df, RATINGS_COLUMNS)
 
+# only (re)publish when data differs from last published version, or any published output is missing
+current_hash = content_hash(csv_text)
+previous_hash = published_hash(csv_path)
+output_paths = published_paths(csv_path) + published_paths("index.html") + [changes_path]
+data_changed = current_hash != previous_hash or not all(os.path.exists(path) for path in output_paths)
 
+if data_changed:
+    # diff kept from most recent data change when only regenerating missing outputs
+    if current_hash != previous_hash or not os.path.exists(changes_path):
+        changes = diff_la_records(csv_path, csv_text)
+        write_atomic(changes_path, json.dumps({
+            "previous_hash": previous_hash,
+            "current_hash": current_hash,
+            **changes
+        }, indent=2, ensure_ascii=False))
+        print(f"Changes: {len(changes['added'])} added, {len(changes['changed'])} changed, {len(changes['removed'])} removed - saved to {changes_path}")
 
-# needs additional testing/verification
-# making the asssumption here that if all the graded cols are unused, it's not an inspection report
-existing_cols = structured_data_df.columns.intersection([
-    'governance_and_leadership', 'staff', 'partnerships_and_services',
-    'information_and_facilities', 'assessment', 'planning',
-    'implementation_and_delivery', 'reviewing',
-    'out_of_court_disposal_policy_and_provision',
-    'resettlement_policy_and_provision', 'policy_and_provision',
-    'joint_working'
-])   
-if not existing_cols.empty:  # avoid dropping if no columns match
-    structured_data_df.dropna(subset=existing_cols, how='all', inplace=True)
-
-structured_data_df.to_csv("hmi_youth_justice_inspection_ratings.csv", index=False)
-print("Data saved to hmi_youth_justice_inspection_ratings.csv")
-
-
-column_order = [
-    'la_name', 'la_ref', 'score_%', 'overall_rating', 'publication_date', 'report_url',
-    'governance_and_leadership', 'staff', 'partnerships_and_services',
-    'information_and_facilities', 'assessment', 'planning',
-    'implementation_and_delivery', 'reviewing',
-    'out_of_court_disposal_policy_and_provision',
-    'resettlement_policy_and_provision', 'policy_and_provision',
-    'joint_working'
-]
+    # published single page
+    publish_output("index.html", html_content)
+    print("✅ Youth Justice Inspections summary saved as `index.html`")
 
+    # CSV published last, its hash marks a complete publish (a failed run above is retried next time)
+    publish_output(csv_path, csv_text)
+    print(f"Data saved to {csv_path}")
+else:
+    print(f"No data changes since last publish (sha256 {current_hash[:12]}), skipping output regeneration")
 
-# create output/published single page
-save_to_html(structured_data_df, column_order)
\ No newline at end of file
+if PROFILE_MODE:
+    write_profile_reports()
\ No newline at end of file